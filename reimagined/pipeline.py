@@ -1,17 +1,31 @@
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Dict, Iterable
 from reimagined.helpers import get_config
-from reimagined.prompting.content_extractor import get_extractor_by_name
+from reimagined.prompting.content_extractor import get_extractor_by_name, BaseExtractor
 from reimagined.prompting.prompter import Prompter
-from reimagined.api import get_api_class_by_name, APIBase
+from reimagined.api import get_api_class_by_name, APIBase, RoutingApi
+from reimagined.watch import FileWatcher
 from omegaconf import OmegaConf
 from pprint import pprint
+import argparse
+import os
 
 VERBOSE = True
 CONF_NAME = "conf_tmp.yaml"
+DEBOUNCE_SECONDS = 0.5  # watch mode: wait for a pause in changes before regenerating
+POLL_INTERVAL_SECONDS = 1.0  # watch mode: used only if watchdog (inotify) is not installed
 
-def load_config() -> OmegaConf:
+def get_parser() -> argparse.ArgumentParser:
+    """Set up argument parser for the pipeline."""
+    parser = argparse.ArgumentParser(description="Generate content with LLM based on configuration files.")
+    parser.add_argument("confs", type=str, nargs="*", default=[CONF_NAME], help="Paths to configuration files.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate outputs when inputs, templates or configs change.")
+    return parser
+
+def load_config(conf_name: str | None = CONF_NAME) -> OmegaConf:
     """Load and return configuration."""
-    conf = get_config() if CONF_NAME is None else get_config(CONF_NAME)
+    conf = get_config() if conf_name is None else get_config(conf_name)
     if VERBOSE:
         pprint(dict(conf))
     return conf
@@ -26,13 +40,27 @@ def write_file(path: str, content: str) -> None:
     with open(path, 'w', encoding='utf-8') as f:
         f.write(content)
 
+@lru_cache(maxsize=None)
+def get_extractor(name: str, mode: str | None = None) -> BaseExtractor:
+    """Return a (cached) extractor instance."""
+    return get_extractor_by_name(name, mode)
+
+def apply_extractor(text: str, extractor_info: OmegaConf | None) -> str:
+    """Extract relevant data from text based on extractor configuration.
+    If `take_only` is set, only the corresponding element is taken, otherwise elements are concatenated according to `mode`.
+    """
+    if extractor_info is None or extractor_info.get("name", None) is None:
+        return text
+    extractor = get_extractor(extractor_info.name, extractor_info.get("mode", None))
+    take_only = extractor_info.get("take_only", None)
+    if take_only is None:
+        return extractor.extract(text)
+    return extractor.extract_elements(text)[take_only]
+
 def extract_param(file_info: OmegaConf) -> str:
     """Extract parameter from file based on configuration."""
     data = read_file(file_info.file)
-    if file_info.get("extractor", None) is None or file_info.extractor.get("name", None) is None:
-        return data
-    extractor = get_extractor_by_name(file_info.extractor.name)
-    return extractor.extract(data)[file_info.extractor.take_only]
+    return apply_extractor(data, file_info.get("extractor", None))
 
 def collect_params(inp_info: OmegaConf) -> Dict[str, str]:
     """Collect parameters from multiple input configurations."""
@@ -43,36 +71,162 @@ def create_prompter(conf: OmegaConf) -> Prompter:
     template = read_file(conf.template)
     return Prompter(template)
 
+@lru_cache(maxsize=None)
+def get_api(api_type: str, model: str, key: str | None) -> APIBase:
+    """Return a (cached) API client, so it's reused across configurations and reloads."""
+    api_cls = get_api_class_by_name(api_type)
+    return api_cls(model=model, token=key)
+
+@lru_cache(maxsize=None)
+def get_routing_api(backends: tuple[tuple[str, str, str, str | None], ...], **params) -> RoutingApi:
+    """Return a (cached) routing API over the given (name, type, model, key) backends.
+
+    Raises ValueError if backend names are not unique.
+    """
+    names = [name for name, _, _, _ in backends]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate routing backend names: {duplicates}")
+    return RoutingApi({name: get_api(api_type, model, key) for name, api_type, model, key in backends}, **params)
+
 def initialize_api(api_conf: OmegaConf) -> APIBase:
     """Initialize and return the API client."""
-    api_cls = get_api_class_by_name(api_conf.type)
-    return api_cls(model=api_conf.model, token=api_conf.key)
+    if api_conf.type == "routing":
+        # Backends are named by `name` if set, otherwise by their position in the list
+        backends = tuple(
+            (backend.get("name", None) or f"{i}:{backend.type}:{backend.model}", backend.type, backend.model,
+             backend.get("key", None))
+            for i, backend in enumerate(api_conf.backends)
+        )
+        params = OmegaConf.to_container(api_conf.get("routing", None) or OmegaConf.create({}))
+        return get_routing_api(backends, **params)
+    return get_api(api_conf.type, api_conf.model, api_conf.get("key", None))
+
+def process_response(response: str, conf: OmegaConf) -> str:
+    """Process and extract relevant data from API response.
+    Uses `out.extractor` if set, otherwise `api.extractor`. If neither is set, the whole response is returned.
+    """
+    extractor_info = conf.out.get("extractor", None) or conf.api.get("extractor", None)
+    return apply_extractor(response, extractor_info)
+
+def get_mtime(path: str) -> int | None:
+    """Return modification time of the file (None if it doesn't exist)."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class PipelineJob:
+    """Pipeline for a single configuration.
+    Keeps the config, prompter, extracted parameters and API client between runs,
+    so that only the parts affected by changed files are recomputed.
+    """
+    def __init__(self, conf_name: str | None = CONF_NAME) -> None:
+        self.conf_name = conf_name
+        self.conf_path = os.path.abspath(conf_name) if conf_name is not None else None
+        self.written: Dict[str, int | None] = {}  # output files written by this job and their modification times
+        self.load()
+
+    def load(self) -> None:
+        """(Re)load configuration and reset everything that depends on it."""
+        # Reset first: if loading fails, parameters of the previous configuration must not be reused
+        self.params: Dict[str, str] = {}
+        self.loaded = False
+        self.conf = load_config(self.conf_name)
+        self.template_path = os.path.abspath(self.conf.template)
+        self.input_paths = {info.name: os.path.abspath(info.file) for info in self.conf.inp}
+        self.prompter = create_prompter(self.conf)
+        self.api = initialize_api(self.conf.api)
+        self.loaded = True
+
+    @property
+    def watched_files(self) -> set[str]:
+        files = {self.template_path, *self.input_paths.values()}
+        if self.conf_path is not None:
+            files.add(self.conf_path)
+        return files
 
-def process_response(response: str, api_conf: OmegaConf) -> str:
-    """Process and extract relevant data from API response."""
-    extractor = get_extractor_by_name(api_conf.extractor.name)
-    return extractor.extract(response)[api_conf.extractor.take_only]
+    def affected_by(self, changed: Iterable[str]) -> set[str]:
+        """Return the changed files relevant to the job, ignoring outputs the job has written itself."""
+        return {
+            path for path in changed
+            if path in self.watched_files and (path not in self.written or self.written[path] != get_mtime(path))
+        }
+
+    def run(self, changed: Iterable[str] | None = None) -> None:
+        """Generate the output.
+        :param changed: Files changed since the last run. If None, everything is recomputed.
+        """
+        changed = set(changed) if changed is not None else None
+        if not self.loaded or (changed is not None and self.conf_path in changed):
+            self.load()
+        elif changed is not None and self.template_path in changed:
+            self.prompter = create_prompter(self.conf)
+
+        for info in self.conf.inp:
+            if changed is None or info.name not in self.params or self.input_paths[info.name] in changed:
+                self.params[info.name] = extract_param(info)
+        if VERBOSE:
+            print("Collected parameters:")
+            pprint(self.params)
+
+        prompt = self.prompter.prompt(**self.params)
+        response = self.api.query(prompt)
+        response_processed = process_response(response, self.conf)
+
+        if VERBOSE:
+            print("Response (after processing):")
+            print(response_processed)
+
+        out_path = os.path.abspath(self.conf.out.file)
+        write_file(out_path, response_processed)
+        self.written[out_path] = get_mtime(out_path)
+
+
+def run_safely(job: PipelineJob, changed: Iterable[str] | None = None) -> None:
+    """Run the job, reporting errors instead of stopping the watch loop."""
+    try:
+        job.run(changed)
+    except Exception as e:
+        print(f"Error while running {job.conf_name}: {e}")
+
+def watch(jobs: list[PipelineJob]) -> None:
+    """Regenerate outputs of the jobs whenever their input files, templates or configs change."""
+    watcher = FileWatcher(
+        set().union(*(job.watched_files for job in jobs)),
+        debounce=DEBOUNCE_SECONDS,
+        poll_interval=POLL_INTERVAL_SECONDS,
+    )
+    watcher.start()
+    print(f"Watching {len(watcher.paths)} files ({'inotify' if watcher.uses_inotify else 'polling'}). Press Ctrl+C to stop.")
+    try:
+        while True:
+            changed = watcher.wait_for_changes()
+            for job in jobs:
+                affected = job.affected_by(changed)
+                if affected:
+                    print(f"Regenerating {job.conf.out.file} (changed: {', '.join(sorted(affected))})")
+                    run_safely(job, affected)
+            # Configuration reloads may change the set of files to watch
+            watcher.set_paths(set().union(*(job.watched_files for job in jobs)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
 
 def main() -> None:
     """Main function to execute the pipeline."""
-    conf = load_config()
-    params = collect_params(conf.inp)
-    if VERBOSE:
-        print("Collected parameters:")
-        pprint(params)
-    
-    prompter = create_prompter(conf)
-    prompt = prompter.prompt(**params)
-    
-    api = initialize_api(conf.api)
-    response = api.query(prompt)
-    response_processed = process_response(response, conf.api)
-    
-    if VERBOSE:
-        print("Response (after processing):")
-        print(response_processed)
-    
-    write_file(conf.out.file, response_processed)
+    args = get_parser().parse_args()
+    jobs = [PipelineJob(conf_name) for conf_name in args.confs]
+    if not args.watch:
+        for job in jobs:
+            job.run()
+        return
+
+    for job in jobs:
+        run_safely(job)
+    watch(jobs)
 
 if __name__ == "__main__":
     main()
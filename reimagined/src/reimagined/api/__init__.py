@@ -1,6 +1,8 @@
 from .base import Prompt, APIBase
+from .pool import ConnectionLimits, get_client_pool, configure_client_pool
 # from .grazie import GrazieApi  # TO-DO: Uncomment this line after implementing Grazie API
 from .openai import OpenAIApi
+from .routing import RoutingApi
 
 def get_api_class_by_name(name: str) -> OpenAIApi:
     """Get the API by name."""
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from grazie.api.client.chat.prompt import ChatPrompt
 from grazie.api.client.endpoints import GrazieApiGatewayUrls
 from grazie.api.client.gateway import AuthType, GrazieAgent, GrazieApiGatewayClient, RequestFailedException
@@ -6,6 +8,13 @@ from grazie.api.client.parameters import Parameters
 from grazie.api.client.profiles import Profile
 
 from .base import Prompt, APIBase
+from .pool import get_client_pool
+
+
+@lru_cache(maxsize=None)
+def get_profile(model: str) -> Profile:
+    """Returns (cached) profile of the model."""
+    return Profile.get_by_name(model)
 
 
 class GrazieApi(APIBase):
@@ -16,19 +25,27 @@ class GrazieApi(APIBase):
         "gpt",
     }
 
+    URL = GrazieApiGatewayUrls.STAGING
+
     def __init__(self, token: str, model: str) -> None:
         """Initializes the API.
         :@param token: Grazie API token.
         :@param model: Name of model to use.
         :@param supports_system: Whether the model supports system messages.
+
+        Clients are shared between instances with the same token (see `reimagined.api.pool`).
+        Note: connection limits of the pool are not applied, the Grazie client manages its own connections.
         """
-        self.client = GrazieApiGatewayClient(
-            grazie_agent=GrazieAgent(name="Rodion.Khvorostov", version="dev"),
-            url=GrazieApiGatewayUrls.STAGING,
-            auth_type=AuthType.USER,
-            grazie_jwt_token=token
+        self.client = get_client_pool().get(
+            "grazie", str(self.URL), token,
+            lambda _limits: GrazieApiGatewayClient(
+                grazie_agent=GrazieAgent(name="Rodion.Khvorostov", version="dev"),
+                url=self.URL,
+                auth_type=AuthType.USER,
+                grazie_jwt_token=token
+            )
         )
-        self.model_profile = Profile.get_by_name(model)
+        self.model_profile = get_profile(model)
         self.supports_system = any(family in model for family in self.MODEL_FAMILIES_SUPPORTING_SYSTEM)
 
     def __call__(self, prompt: Prompt) -> str:
@@ -1,16 +1,36 @@
+import os
+
+import httpx
 import openai
 
 from .base import Prompt, APIBase
+from .pool import ConnectionLimits, get_client_pool
 
 
 class OpenAIApi(APIBase):
-    def __init__(self, model: str, token: str | None = None) -> None:
+    def __init__(self, model: str, token: str | None = None, base_url: str | None = None) -> None:
         """Initializes the API.
         :param model: Name of model to use.
         :param token: OpenAI API token. If None, the token will be read from the OPENAI_API_KEY environment variable.
+        :param base_url: URL of the API. If None, the default OpenAI URL is used.
+
+        Clients are shared between instances with the same token and URL (see `reimagined.api.pool`).
         """
         self.model = model
-        self.client = openai.OpenAI(api_key=token)
+        token = token or os.environ.get("OPENAI_API_KEY")
+        self.client = get_client_pool().get(
+            "openai", base_url, token,
+            lambda limits: self._create_client(token, base_url, limits)
+        )
+
+    @staticmethod
+    def _create_client(token: str | None, base_url: str | None, limits: ConnectionLimits) -> openai.OpenAI:
+        http_client = httpx.Client(limits=httpx.Limits(
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+        ))
+        return openai.OpenAI(api_key=token, base_url=base_url, http_client=http_client)
 
     def __call__(self, prompt: Prompt) -> str:
         """Returns generated text."""
@@ -0,0 +1,75 @@
+import atexit
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class ConnectionLimits:
+    """HTTP connection settings for pooled clients."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0  # seconds an idle connection is kept alive
+
+
+class ClientPool:
+    """Process-wide pool of API clients keyed on (provider, endpoint, token).
+
+    All API objects with the same credentials share one client and, therefore, its connections.
+    """
+    def __init__(self, limits: ConnectionLimits | None = None) -> None:
+        self.limits = limits or ConnectionLimits()
+        self._clients: dict[tuple[str, str | None, str | None], Any] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, limits: ConnectionLimits) -> None:
+        """Set connection limits. Applies only to clients created afterwards."""
+        self.limits = limits
+
+    def get(self, provider: str, endpoint: str | None, token: str | None,
+            factory: Callable[[ConnectionLimits], Any]) -> Any:
+        """Return the pooled client, creating it with `factory(limits)` if needed.
+        :param provider: Name of the API provider (e.g. "openai").
+        :param endpoint: URL of the API (None for the provider's default).
+        :param token: API token.
+        :param factory: Creates a new client given connection limits.
+        """
+        key = (provider, endpoint, token)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = factory(self.limits)
+            return self._clients[key]
+
+    def close(self) -> None:
+        """Close all clients and empty the pool."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+
+
+_POOL = ClientPool()
+atexit.register(_POOL.close)
+
+
+def get_client_pool() -> ClientPool:
+    """Get the process-wide client pool."""
+    return _POOL
+
+
+def configure_client_pool(max_connections: int | None = None, max_keepalive_connections: int | None = None,
+                          keepalive_expiry: float | None = None) -> None:
+    """Configure HTTP connection limits of the process-wide pool (only for clients created afterwards)."""
+    limits = _POOL.limits
+    _POOL.configure(ConnectionLimits(
+        max_connections=limits.max_connections if max_connections is None else max_connections,
+        max_keepalive_connections=(
+            limits.max_keepalive_connections if max_keepalive_connections is None else max_keepalive_connections
+        ),
+        keepalive_expiry=limits.keepalive_expiry if keepalive_expiry is None else keepalive_expiry,
+    ))
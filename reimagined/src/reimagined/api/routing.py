@@ -0,0 +1,254 @@
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable
+from dataclasses import dataclass, field
+
+from .base import Prompt, APIBase
+
+
+@dataclass
+class BackendStats:
+    """Routing statistics of a single backend."""
+    window: int = 100
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    wins: int = 0  # requests answered by this backend
+    hedges: int = 0  # requests sent to this backend as a hedged duplicate
+    latencies: deque = field(default_factory=deque)  # latencies (seconds) of the last `window` successful requests
+
+    def add_latency(self, latency: float) -> None:
+        self.latencies.append(latency)
+        while len(self.latencies) > self.window:
+            self.latencies.popleft()
+
+    def percentile(self, q: float) -> float | None:
+        """Returns q-th percentile (0-100) of recent latencies, None if there are no measurements."""
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        rank = max(math.ceil(q / 100 * len(latencies)), 1)
+        return latencies[rank - 1]
+
+    def as_dict(self) -> dict:
+        return dict(
+            requests=self.requests,
+            successes=self.successes,
+            failures=self.failures,
+            wins=self.wins,
+            hedges=self.hedges,
+            p50=self.percentile(50),
+            p95=self.percentile(95),
+        )
+
+
+class RoutingApi(APIBase):
+    """Routes requests between several backends.
+
+    - Backends are tried in the order of their median latency (the configured order is kept until measured).
+    - If the response takes longer than the backend's p95 latency, a hedged duplicate is sent to the next backend.
+      Latency is measured from the moment the call starts running, time spent waiting for a free worker is not counted.
+      The first successful response is returned, the other request is cancelled if it hasn't started yet
+      (requests already in flight can't be interrupted, their results are only used for statistics).
+      Calls run on daemon threads, so a losing request doesn't delay the exit of the program.
+    - If a backend fails, the request is sent to the next backend right away.
+    """
+    def __init__(self, backends: dict[str, APIBase], hedge_percentile: float = 95, max_hedges: int = 1,
+                 default_hedge_delay: float = 5.0, min_hedge_delay: float = 0.1, min_samples: int = 10,
+                 window: int = 100, max_workers: int = 32) -> None:
+        """Initializes the API.
+        :param backends: Backends by name, in the order of preference.
+        :param hedge_percentile: Latency percentile of a backend after which a hedged request is sent.
+        :param max_hedges: Maximum number of hedged duplicates per request (failovers are not limited).
+        :param default_hedge_delay: Hedge delay (seconds) for backends with less than `min_samples` measurements.
+        :param min_hedge_delay: Lower bound of the hedge delay (seconds).
+        :param min_samples: Number of measurements needed to use the backend's latency.
+        :param window: Number of recent requests used to compute latency percentiles.
+        :param max_workers: Maximum number of backend calls running at the same time (shared by all requests).
+        """
+        if not backends:
+            raise ValueError("At least one backend is required.")
+        self.backends = dict(backends)
+        self.hedge_percentile = hedge_percentile
+        self.max_hedges = max_hedges
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self._stats = {name: BackendStats(window=window) for name in self.backends}
+        self._lock = threading.Lock()
+        self._workers = _DaemonWorkers(max_workers)
+
+    @property
+    def stats(self) -> dict[str, dict]:
+        """Routing statistics per backend."""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def ranked_backends(self) -> list[str]:
+        """Backend names in the order they are tried."""
+        with self._lock:
+            medians = {
+                name: stats.percentile(50) if len(stats.latencies) >= self.min_samples else None
+                for name, stats in self._stats.items()
+            }
+        return sorted(self.backends, key=lambda name: math.inf if medians[name] is None else medians[name])
+
+    def hedge_delay(self, name: str) -> float:
+        """Time (seconds) to wait for the backend before sending a hedged request."""
+        with self._lock:
+            stats = self._stats[name]
+            if len(stats.latencies) < self.min_samples:
+                return self.default_hedge_delay
+            return max(stats.percentile(self.hedge_percentile), self.min_hedge_delay)
+
+    def _submit(self, name: str, prompt: Prompt, hedge: bool = False) -> "_Call":
+        """Schedule a call of the backend. Statistics are updated only once the call starts running."""
+        backend_call = _Call(name)
+
+        def run() -> str:
+            backend_call.started_at = time.monotonic()
+            with self._lock:
+                self._stats[name].requests += 1
+                if hedge:
+                    self._stats[name].hedges += 1
+            try:
+                response = self.backends[name](prompt)
+            except Exception:
+                with self._lock:
+                    self._stats[name].failures += 1
+                raise
+            with self._lock:
+                self._stats[name].successes += 1
+                self._stats[name].add_latency(time.monotonic() - backend_call.started_at)
+            return response
+
+        backend_call.future = self._workers.submit(run)
+        return backend_call
+
+    def __call__(self, prompt: Prompt) -> str:
+        """Returns generated text of the first backend to respond successfully."""
+        remaining = self.ranked_backends()
+        pending: dict[Future, _Call] = {}
+        hedges = 0
+        last_error: Exception | None = None
+
+        def launch(hedge: bool = False) -> _Call:
+            backend_call = self._submit(remaining.pop(0), prompt, hedge)
+            pending[backend_call.future] = backend_call
+            return backend_call
+
+        last_call = launch()
+        delay = self.hedge_delay(last_call.name)
+        while pending:
+            timeout = None
+            started_at = last_call.started_at
+            if remaining and hedges < self.max_hedges:
+                # Until the call starts, check back after `delay`; afterwards wait for the rest of it
+                timeout = delay if started_at is None else max(delay - (time.monotonic() - started_at), 0)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if started_at is None:  # The call was waiting for a worker, it's not the backend being slow
+                    continue
+                # Too slow, send a hedged request
+                hedges += 1
+                last_call = launch(hedge=True)
+                delay = self.hedge_delay(last_call.name)
+                continue
+
+            for future in done:
+                backend_call = pending.pop(future)
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    with self._lock:
+                        self._stats[backend_call.name].wins += 1
+                    return future.result()
+                last_error = future.exception()
+
+            # Fail over to the next backend
+            if remaining:
+                last_call = launch()
+                delay = self.hedge_delay(last_call.name)
+
+        raise last_error
+
+    def close(self) -> None:
+        """Stop the worker threads and cancel queued calls (requests in flight are not waited for)."""
+        self._workers.shutdown()
+
+
+class _Call:
+    """A scheduled call of a backend."""
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.future: Future | None = None
+        self.started_at: float | None = None  # time.monotonic() when the call started running
+
+
+class _DaemonWorkers:
+    """Minimal thread pool with daemon threads.
+
+    Unlike concurrent.futures.ThreadPoolExecutor, running calls are not joined at interpreter exit.
+    Threads are started on demand, up to `max_workers`.
+    """
+    def __init__(self, max_workers: int) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be positive.")
+        self.max_workers = max_workers
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._threads: list[threading.Thread] = []
+        self._idle = 0  # threads waiting for a call
+        self._queued = 0  # calls waiting for a thread
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, fn: Callable[[], str]) -> Future:
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit calls after shutdown.")
+            self._queue.put((future, fn))
+            self._queued += 1
+            if self._queued > self._idle and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True, name=f"routing-api-{len(self._threads)}")
+                self._threads.append(thread)
+                self._idle += 1
+                thread.start()
+        return future
+
+    def shutdown(self) -> None:
+        """Cancel queued calls and let the threads finish."""
+        with self._lock:
+            self._shutdown = True
+            threads = len(self._threads)
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+        for _ in range(threads):
+            self._queue.put(None)
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn = item
+            with self._lock:
+                self._idle -= 1
+                self._queued -= 1
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn())
+                except BaseException as e:
+                    future.set_exception(e)
+            with self._lock:
+                self._idle += 1
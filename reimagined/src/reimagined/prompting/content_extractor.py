@@ -97,4 +97,8 @@ def get_extractor_class_by_name(name: str) -> Type[BaseExtractor]:
     for class_name, cls in classes:
         if class_name.lower() == name.lower():
             return cls
-    raise ValueError(f"Extractor with name {name} not found.")
\ No newline at end of file
+    raise ValueError(f"Extractor with name {name} not found.")
+
+def get_extractor_by_name(name: str, concatenation_type: str | None = None) -> BaseExtractor:
+    """Get an instance of the extractor by name."""
+    return get_extractor_class_by_name(name)(concatenation_type)
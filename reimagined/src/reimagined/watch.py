@@ -0,0 +1,133 @@
+import os
+import queue
+import threading
+from typing import Callable, Iterable
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional, fall back to polling
+    Observer = None
+
+
+class FileWatcher:
+    """Watch a set of files and report changes in debounced batches.
+
+    Uses watchdog (inotify on Linux) if it's installed, otherwise polls modification times.
+    """
+    def __init__(self, paths: Iterable[str], debounce: float = 0.5, poll_interval: float = 1.0) -> None:
+        """Initializes the watcher.
+        :param paths: Files to watch.
+        :param debounce: Seconds without new changes before a batch is reported.
+        :param poll_interval: Seconds between checks in polling mode.
+        """
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.paths: set[str] = set()
+        self._changes: queue.Queue[str] = queue.Queue()
+        self._mtimes: dict[str, int | None] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._watches: dict = {}  # watched directory -> watchdog watch
+        self.set_paths(paths)
+
+    @property
+    def uses_inotify(self) -> bool:
+        return Observer is not None
+
+    def set_paths(self, paths: Iterable[str]) -> None:
+        """Replace the set of watched files."""
+        with self._lock:
+            self.paths = {os.path.abspath(path) for path in paths}
+            # Keep known modification times, so changes made in between are not lost
+            self._mtimes = {
+                path: self._mtimes[path] if path in self._mtimes else self._get_mtime(path)
+                for path in self.paths
+            }
+        if self._observer is not None:
+            self._schedule()
+
+    def start(self) -> None:
+        """Start watching in a background thread."""
+        if self.uses_inotify:
+            self._observer = Observer()
+            self._schedule()
+            self._observer.start()
+        else:
+            threading.Thread(target=self._poll, daemon=True).start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+            self._watches = {}
+
+    def wait_for_changes(self) -> set[str]:
+        """Block until some files change and return them.
+        Changes coming in quick succession (e.g. bursts of saves) are merged into a single batch.
+        """
+        changed = {self._changes.get()}
+        while True:
+            try:
+                changed.add(self._changes.get(timeout=self.debounce))
+            except queue.Empty:
+                return changed
+
+    def _notify(self, path: str) -> None:
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self.paths:
+                return
+            # Filter out duplicate events (e.g. several writes of a single save)
+            mtime = self._get_mtime(path)
+            if mtime == self._mtimes.get(path):
+                return
+            self._mtimes[path] = mtime
+        self._changes.put(path)
+
+    def _poll(self) -> None:
+        while not self._stopped.wait(self.poll_interval):
+            with self._lock:
+                paths = list(self.paths)
+            for path in paths:
+                self._notify(path)
+
+    def _schedule(self) -> None:
+        """Update directory watches for the current set of files.
+        Only added and removed directories are (un)scheduled, so events in other directories are not missed.
+        """
+        with self._lock:
+            directories = {os.path.dirname(path) for path in self.paths}
+        for directory in set(self._watches) - directories:
+            self._observer.unschedule(self._watches.pop(directory))
+        for directory in directories - set(self._watches):
+            if os.path.isdir(directory):
+                self._watches[directory] = self._observer.schedule(
+                    _EventHandler(self._notify), directory, recursive=False
+                )
+
+    @staticmethod
+    def _get_mtime(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+
+if Observer is not None:
+    class _EventHandler(FileSystemEventHandler):
+        """Forward watchdog events to the watcher."""
+        def __init__(self, notify: Callable[[str], None]) -> None:
+            self.notify = notify
+
+        def on_any_event(self, event) -> None:
+            if event.is_directory:
+                return
+            self.notify(event.src_path)
+            # Editors often save files by moving a temporary file over the original
+            dest_path = getattr(event, "dest_path", None)
+            if dest_path:
+                self.notify(dest_path)
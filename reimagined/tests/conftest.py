@@ -0,0 +1,7 @@
+import os
+import sys
+
+# reimagined is used from the source tree (it isn't installed as a package), pipeline.py is a script next to it
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, ROOT)
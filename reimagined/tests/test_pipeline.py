@@ -0,0 +1,170 @@
+import os
+
+import pytest
+
+pytest.importorskip("omegaconf")
+import pipeline
+from pipeline import PipelineJob
+from reimagined.api.base import APIBase, Prompt
+
+
+class StubApi(APIBase):
+    """Returns the prompt wrapped in a python code block and remembers all prompts."""
+    def __init__(self) -> None:
+        self.prompts: list[str] = []
+
+    def __call__(self, prompt: Prompt) -> str:
+        self.prompts.append(prompt.content)
+        return f"Sure!\n```python\n{prompt.content}\n```"
+
+
+def write(path, content: str) -> None:
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = StubApi()
+    monkeypatch.setattr(pipeline, "VERBOSE", False)
+    monkeypatch.setattr(pipeline, "initialize_api", lambda api_conf: api)
+    return api
+
+
+@pytest.fixture
+def extracted(monkeypatch):
+    """Names of parameters extracted from files."""
+    names = []
+    extract_param = pipeline.extract_param
+
+    def extract(file_info):
+        names.append(file_info.name)
+        return extract_param(file_info)
+
+    monkeypatch.setattr(pipeline, "extract_param", extract)
+    return names
+
+
+def write_config(tmp_path, out: str = "out.py", inputs: dict[str, str] | None = None, template: str = "template.md") -> str:
+    inputs = inputs or {"code": "code.py", "desc": "desc.txt"}
+    inp = "".join(f"  - file: {tmp_path / file}\n    name: {name}\n" for name, file in inputs.items())
+    conf_path = tmp_path / "conf.yaml"
+    write(conf_path, (
+        f"template: {tmp_path / template}\n"
+        "api:\n  type: stub\n"
+        f"inp:\n{inp}"
+        f"out:\n  file: {tmp_path / out}\n  extractor:\n    name: PythonCodeExtractor\n"
+    ))
+    return str(conf_path)
+
+
+@pytest.fixture
+def project(tmp_path):
+    write(tmp_path / "template.md", "Code: {code} Description: {desc} ")
+    write(tmp_path / "code.py", "x = 1")
+    write(tmp_path / "desc.txt", "one")
+    return tmp_path
+
+
+def test_run(project, api):
+    PipelineJob(write_config(project)).run()
+    with open(project / "out.py") as f:
+        assert f.read() == "Code: x = 1 Description: one"
+
+
+def test_only_changed_inputs_are_extracted(project, api, extracted):
+    job = PipelineJob(write_config(project))
+    job.run()
+    assert sorted(extracted) == ["code", "desc"]
+
+    write(project / "desc.txt", "two")
+    job.run({str(project / "desc.txt")})
+    assert sorted(extracted) == ["code", "desc", "desc"]
+    assert api.prompts[-1] == "Code: x = 1 Description: two "
+
+    write(project / "template.md", "New: {code}, {desc} ")
+    job.run({str(project / "template.md")})
+    assert len(extracted) == 3
+    assert api.prompts[-1] == "New: x = 1, two "
+
+
+def test_config_change_reloads_everything(project, api, extracted):
+    conf_path = write_config(project)
+    job = PipelineJob(conf_path)
+    job.run()
+
+    write(project / "other.py", "y = 2")
+    write_config(project, inputs={"code": "other.py", "desc": "desc.txt"})
+    job.run({conf_path})
+    assert sorted(extracted) == ["code", "code", "desc", "desc"]
+    assert api.prompts[-1] == "Code: y = 2 Description: one "
+
+
+def test_failed_reload_does_not_reuse_params(project, api):
+    conf_path = write_config(project)
+    job = PipelineJob(conf_path)
+    job.run()
+
+    # New config points to another input, but its template doesn't exist yet
+    write(project / "other.py", "y = 2")
+    write_config(project, inputs={"code": "other.py", "desc": "desc.txt"}, template="new_template.md")
+    with pytest.raises(FileNotFoundError):
+        job.run({conf_path})
+
+    write(project / "new_template.md", "Code {code}, {desc} ")
+    job.run({str(project / "new_template.md")})
+    assert api.prompts[-1] == "Code y = 2, one "
+
+
+def test_affected_by_ignores_own_writes(project, api):
+    # The output overwrites the input (e.g. adding typing to a file)
+    job = PipelineJob(write_config(project, out="code.py"))
+    code, desc = str(project / "code.py"), str(project / "desc.txt")
+    job.run()
+
+    assert job.affected_by({code, str(project / "unrelated.txt")}) == set()
+    write(project / "desc.txt", "two")
+    assert job.affected_by({code, desc}) == {desc}
+
+    # Changes made by someone else after the job's write are not ignored
+    stat = os.stat(code)
+    os.utime(code, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert job.affected_by({code}) == {code}
+
+
+@pytest.fixture
+def routing_backends(monkeypatch):
+    """Replace backend creation with stubs, remembering (type, model, key) of each one."""
+    created = []
+
+    def get_api(api_type, model, key):
+        created.append((api_type, model, key))
+        return StubApi()
+
+    monkeypatch.setattr(pipeline, "get_api", get_api)
+    pipeline.get_routing_api.cache_clear()
+    yield created
+    pipeline.get_routing_api.cache_clear()
+
+
+def routing_conf(*backends: str):
+    from omegaconf import OmegaConf
+    return OmegaConf.create("type: routing\nbackends:\n" + "".join(backends))
+
+
+def test_routing_backends_with_same_model(routing_backends):
+    api = pipeline.initialize_api(routing_conf(
+        "  - {type: openai, model: gpt-4o-mini, key: first}\n",
+        "  - {type: openai, model: gpt-4o-mini, key: second}\n",
+        "  - {name: fallback, type: openai, model: gpt-4o-mini, key: third}\n",
+    ))
+    assert list(api.backends) == ["0:openai:gpt-4o-mini", "1:openai:gpt-4o-mini", "fallback"]
+    assert [key for _, _, key in routing_backends] == ["first", "second", "third"]
+
+
+def test_routing_duplicate_names(routing_backends):
+    with pytest.raises(ValueError, match="Duplicate"):
+        pipeline.initialize_api(routing_conf(
+            "  - {name: main, type: openai, model: gpt-4o-mini, key: first}\n",
+            "  - {name: main, type: openai, model: gpt-3.5-turbo, key: second}\n",
+        ))
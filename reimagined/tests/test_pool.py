@@ -0,0 +1,80 @@
+import pytest
+
+from reimagined.api import pool
+from reimagined.api.pool import ClientPool, ConnectionLimits, configure_client_pool, get_client_pool
+
+
+class FakeClient:
+    def __init__(self, limits: ConnectionLimits) -> None:
+        self.limits = limits
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_same_key_shares_client():
+    clients = ClientPool()
+    first = clients.get("openai", None, "token", FakeClient)
+    second = clients.get("openai", None, "token", FakeClient)
+    assert first is second
+
+
+@pytest.mark.parametrize("key", [
+    ("openai", None, "other-token"),
+    ("openai", "https://example.com/v1", "token"),
+    ("grazie", None, "token"),
+])
+def test_different_key_gets_new_client(key):
+    clients = ClientPool()
+    assert clients.get("openai", None, "token", FakeClient) is not clients.get(*key, FakeClient)
+
+
+def test_configure_affects_only_new_clients(monkeypatch):
+    monkeypatch.setattr(pool, "_POOL", ClientPool())
+    old = get_client_pool().get("openai", None, "old", FakeClient)
+
+    configure_client_pool(max_connections=5, keepalive_expiry=1.0)
+    new = get_client_pool().get("openai", None, "new", FakeClient)
+
+    assert old.limits == ConnectionLimits()
+    assert new.limits == ConnectionLimits(max_connections=5, keepalive_expiry=1.0)
+    assert get_client_pool().get("openai", None, "old", FakeClient) is old
+
+
+def test_close_empties_pool():
+    clients = ClientPool()
+    first = clients.get("openai", None, "token", FakeClient)
+    without_close = clients.get("grazie", None, "token", lambda limits: object())
+    clients.close()
+
+    assert first.closed
+    second = clients.get("openai", None, "token", FakeClient)
+    assert second is not first and not second.closed
+    assert clients.get("grazie", None, "token", lambda limits: object()) is not without_close
+
+
+def test_close_ignores_errors():
+    class BrokenClient(FakeClient):
+        def close(self) -> None:
+            raise RuntimeError("already closed")
+
+    clients = ClientPool()
+    clients.get("openai", None, "a", BrokenClient)
+    fine = clients.get("openai", None, "b", FakeClient)
+    clients.close()
+    assert fine.closed
+
+
+def test_openai_api_shares_client(monkeypatch):
+    pytest.importorskip("openai")
+    from reimagined.api import openai as openai_api
+    clients = ClientPool()
+    monkeypatch.setattr(openai_api, "get_client_pool", lambda: clients)
+
+    first = openai_api.OpenAIApi(model="gpt-4o-mini", token="token")
+    second = openai_api.OpenAIApi(model="gpt-3.5-turbo", token="token")
+    other = openai_api.OpenAIApi(model="gpt-4o-mini", token="other-token")
+    assert first.client is second.client
+    assert first.client is not other.client
+    clients.close()
@@ -0,0 +1,160 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from reimagined.api.base import APIBase, Prompt, UnsuccessfulRequestException
+from reimagined.api.routing import BackendStats, RoutingApi
+
+
+class StubApi(APIBase):
+    """Backend which sleeps for the given times (the last one is repeated) and returns its name."""
+    def __init__(self, name: str, delays: list[float], fail: bool = False) -> None:
+        self.name = name
+        self.delays = list(delays)
+        self.fail = fail
+
+    def __call__(self, prompt: Prompt) -> str:
+        delay = self.delays.pop(0) if len(self.delays) > 1 else self.delays[0]
+        time.sleep(delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return self.name
+
+
+@pytest.fixture
+def make_api():
+    apis = []
+
+    def make(backends: dict[str, APIBase], **params) -> RoutingApi:
+        api = RoutingApi(backends, **params)
+        apis.append(api)
+        return api
+
+    yield make
+    for api in apis:
+        api.close()
+
+
+PROMPT = Prompt(content="Hello")
+
+
+def test_hedge_after_p95_delay(make_api):
+    # `slow` answers quickly 5 times, then stalls
+    api = make_api(
+        {"slow": StubApi("slow", [0.02] * 5 + [1.0]), "fast": StubApi("fast", [0.02])},
+        min_samples=5, min_hedge_delay=0.01,
+    )
+    assert [api.query(PROMPT) for _ in range(5)] == ["slow"] * 5
+    assert api.stats["fast"]["requests"] == 0
+
+    start = time.monotonic()
+    assert api.query(PROMPT) == "fast"
+    assert time.monotonic() - start < 0.5
+
+    stats = api.stats
+    assert stats["fast"]["hedges"] == 1
+    assert stats["fast"]["wins"] == 1
+    assert stats["slow"]["wins"] == 5
+
+
+def test_no_hedge_before_delay(make_api):
+    api = make_api({"a": StubApi("a", [0.05]), "b": StubApi("b", [0.05])}, default_hedge_delay=1.0)
+    assert api.query(PROMPT) == "a"
+    assert api.stats["b"]["requests"] == 0
+
+
+def test_failover_on_error(make_api):
+    api = make_api({"broken": StubApi("broken", [0.01], fail=True), "ok": StubApi("ok", [0.01])})
+    assert api.query(PROMPT) == "ok"
+
+    stats = api.stats
+    assert stats["broken"]["failures"] == 1
+    assert stats["ok"]["wins"] == 1
+    assert stats["ok"]["hedges"] == 0
+
+
+def test_all_backends_fail(make_api):
+    api = make_api({
+        "a": StubApi("a", [0.01], fail=True),
+        "b": StubApi("b", [0.01], fail=True),
+    })
+    with pytest.raises(UnsuccessfulRequestException):
+        api.query(PROMPT)
+    assert all(stats["failures"] == 1 for stats in api.stats.values())
+
+
+def test_stats(make_api):
+    api = make_api({"a": StubApi("a", [0.01, 0.01, 0.01, 0.05])}, min_samples=1)
+    for _ in range(4):
+        api.query(PROMPT)
+
+    stats = api.stats["a"]
+    assert (stats["requests"], stats["successes"], stats["failures"], stats["wins"]) == (4, 4, 0, 4)
+    assert 0.01 <= stats["p50"] < 0.05
+    assert stats["p95"] >= 0.05
+
+
+def test_backend_stats_percentiles():
+    stats = BackendStats(window=100)
+    assert stats.percentile(50) is None
+    for latency in range(1, 201):
+        stats.add_latency(latency)
+
+    # Only the last `window` latencies are kept
+    assert len(stats.latencies) == 100
+    assert stats.percentile(50) == 150
+    assert stats.percentile(95) == 195
+    assert stats.percentile(0) == 101
+
+
+def test_backends_ranked_by_median(make_api):
+    api = make_api({"slow": StubApi("slow", [0.05]), "fast": StubApi("fast", [0.01])}, min_samples=1)
+    assert api.ranked_backends() == ["slow", "fast"]  # configured order until measured
+
+    with api._lock:
+        api._stats["slow"].add_latency(0.05)
+        api._stats["fast"].add_latency(0.01)
+    assert api.ranked_backends() == ["fast", "slow"]
+
+
+def test_losing_request_does_not_delay_exit():
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {src!r})
+        from reimagined.api.base import APIBase, Prompt
+        from reimagined.api.routing import RoutingApi
+
+        class StubApi(APIBase):
+            def __init__(self, name, delay):
+                self.name, self.delay = name, delay
+
+            def __call__(self, prompt):
+                time.sleep(self.delay)
+                return self.name
+
+        api = RoutingApi({{"slow": StubApi("slow", 10), "fast": StubApi("fast", 0.01)}}, default_hedge_delay=0.05)
+        print(api.query(Prompt(content="Hello")))
+    """)
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "fast"
+    assert time.monotonic() - start < 5
+
+
+def test_close_cancels_queued_calls(make_api):
+    api = make_api({"a": StubApi("a", [0.2])}, max_workers=1)
+    running = api._submit("a", PROMPT)
+    queued = api._submit("a", PROMPT)
+    api.close()
+
+    assert running.future.result() == "a"
+    assert queued.future.cancelled()
+    assert api.stats["a"]["requests"] == 1
+    with pytest.raises(UnsuccessfulRequestException, match="shutdown"):
+        api.query(PROMPT)
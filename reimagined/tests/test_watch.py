@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+import pytest
+
+from reimagined import watch
+from reimagined.watch import FileWatcher
+
+
+def write(path, content: str) -> None:
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture(params=["polling", "inotify"])
+def make_watcher(request, monkeypatch):
+    if request.param == "polling":
+        monkeypatch.setattr(watch, "Observer", None)
+    elif watch.Observer is None:
+        pytest.skip("watchdog is not installed")
+    watchers = []
+
+    def make(paths, debounce: float = 0.2) -> FileWatcher:
+        watcher = FileWatcher(paths, debounce=debounce, poll_interval=0.02)
+        watcher.start()
+        watchers.append(watcher)
+        return watcher
+
+    yield make
+    for watcher in watchers:
+        watcher.stop()
+
+
+def wait_for_changes(watcher: FileWatcher, timeout: float = 5.0) -> set[str]:
+    """wait_for_changes with a timeout, so that a broken watcher fails the test instead of hanging it."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(watcher.wait_for_changes()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert result, "no changes reported"
+    return result[0]
+
+
+def test_burst_of_saves_is_one_batch(tmp_path, make_watcher):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    write(a, "a")
+    write(b, "b")
+    watcher = make_watcher([a, b])
+
+    for i in range(5):
+        write(a, f"a{i}")
+        write(b, f"b{i}")
+        time.sleep(0.05)
+    assert wait_for_changes(watcher) == {str(a), str(b)}
+    assert watcher._changes.empty()
+
+
+def test_unwatched_files_are_ignored(tmp_path, make_watcher):
+    watched, other = tmp_path / "watched.txt", tmp_path / "other.txt"
+    write(watched, "")
+    watcher = make_watcher([watched])
+
+    write(other, "changed")
+    time.sleep(0.1)
+    write(watched, "changed")
+    assert wait_for_changes(watcher) == {str(watched)}
+
+
+def test_set_paths(tmp_path, make_watcher):
+    first, second = tmp_path / "first.txt", tmp_path / "second" / "second.txt"
+    os.makedirs(second.parent)
+    write(first, "")
+    write(second, "")
+    watcher = make_watcher([first])
+    watches = dict(watcher._watches)
+
+    watcher.set_paths([first, second])
+    # Watches of unchanged directories are kept
+    assert all(watcher._watches[directory] is watch_ for directory, watch_ in watches.items())
+
+    write(second, "changed")
+    assert wait_for_changes(watcher) == {str(second)}
+
+    watcher.set_paths([second])
+    write(first, "changed")
+    time.sleep(0.1)
+    write(second, "changed again")
+    assert wait_for_changes(watcher) == {str(second)}
+    if watcher.uses_inotify:
+        assert set(watcher._watches) == {str(second.parent)}
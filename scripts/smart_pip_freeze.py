@@ -8,21 +8,37 @@ Idea:
 2. Loosen the version constraints for the packages.
 3. Update the requirements.txt file with the loosened version constraints.
     Note: If the package already exists in the requirements.txt file, keep the existing version constraint.
+
+Monorepo mode (--monorepo):
+1. Walk the target folder once, detect subproject roots (folders with setup.py, pyproject.toml or a requirements file)
+    and collect the top-level imports of every python file, attributing it to the closest subproject root.
+2. Map the imports of each subproject to PyPI packages with the pipreqs mapping
+    and resolve their versions once for all subprojects (locally installed packages first, then PyPI).
+3. Update each subproject's requirements file.
 """
 
 import argparse
+import ast
 import os
 import subprocess
 from typing import List, Tuple
 import tempfile
 
+SUBPROJECT_MARKERS = ("setup.py", "pyproject.toml")
+IGNORED_DIRS = {"__pycache__", "venv", "env", "build", "dist", "node_modules"}
+# pipreqs helpers used in monorepo mode. They are not part of pipreqs public API (checked with pipreqs 0.5.0).
+PIPREQS_HELPERS = ("join", "get_pkg_names", "get_locally_installed_packages", "get_imports_info")
+
 def get_parser():
     """
     Set up argument parser for the script.
     """
     parser = argparse.ArgumentParser(description="Update requirements.txt with pipreqs and add version constraints.")
     parser.add_argument("target_folder", type=str, help="Path to the target folder containing the code.")
-    parser.add_argument("requirements_path", type=str, default="requirements.txt", help="Path to the requirements.txt file.")
+    parser.add_argument("requirements_path", type=str, nargs="?", default="requirements.txt",
+                        help="Path to the requirements.txt file. In monorepo mode, the file name used inside each subproject.")
+    parser.add_argument("--monorepo", action="store_true",
+                        help="Detect subprojects in the target folder and update the requirements file of each one.")
     return parser
 
 
@@ -137,18 +153,185 @@ def save_requirements(file_path: str, requirements: List[dict[str, str]]) -> Non
         for package in requirements:
             f.write(f"{package['name']}{package['constraint']}\n")
 
-def update_requirements(target_folder: str):
+def update_requirements_file(requirements_file: str, pipreqs_requirements: List[dict[str, str]]) -> None:
     """
-    Update requirements.txt with pipreqs and add loosened version constraints.
+    Merge loosened pipreqs requirements into the requirements file and save it.
     """
-    requirements_file = "requirements.txt"
-    pipreqs_requirements = get_requirements_with_pipreqs(target_folder)
     pipreqs_requirements = convert_to_loosened_constraint(pipreqs_requirements)
 
     existing_requirements = convert_to_info_dict(read_requirements(requirements_file))
     merged_requirements = merge_requirements(existing_requirements, pipreqs_requirements)
 
     save_requirements(requirements_file, merged_requirements)
+
+def update_requirements(target_folder: str, requirements_path: str = "requirements.txt"):
+    """
+    Update requirements.txt with pipreqs and add loosened version constraints.
+    """
+    pipreqs_requirements = get_requirements_with_pipreqs(target_folder)
+    update_requirements_file(requirements_path, pipreqs_requirements)
+
+
+def get_file_imports(file_path: str) -> set[str]:
+    """
+    Get top-level names of absolute imports in a python file.
+    Files that can't be parsed are skipped (pipreqs ignores them as well).
+
+    Example:
+    import numpy.linalg --> "numpy"
+    from sklearn import metrics --> "sklearn"
+    from . import utils --> (ignored)
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=file_path)
+    except (SyntaxError, UnicodeDecodeError, ValueError):
+        return set()
+
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            imports.add(node.module.split(".")[0])
+    return imports
+
+def import_pipreqs():
+    """
+    Import pipreqs module for monorepo mode.
+    Raises ImportError if pipreqs isn't installed or doesn't provide the helpers used by this script.
+    """
+    try:
+        from pipreqs import pipreqs
+    except ImportError as e:
+        raise ImportError("Monorepo mode requires pipreqs to be installed in the current interpreter.") from e
+
+    missing = [name for name in PIPREQS_HELPERS if not hasattr(pipreqs, name)]
+    if missing:
+        raise ImportError(f"Unsupported pipreqs version (checked with 0.5.0), missing helpers: {missing}.")
+    return pipreqs
+
+def scan_subprojects(target_folder: str, requirements_name: str = "requirements.txt") -> Tuple[dict[str, set[str]], dict[str, set[str]]]:
+    """
+    Walk the target folder once and collect imports per subproject.
+    A subproject root is a folder containing setup.py, pyproject.toml or the requirements file.
+    Each python file is attributed to the closest subproject root above it;
+    files outside of any subproject are ignored.
+
+    Also collects names of local top-level modules (folders and python files outside of a package) per subproject,
+    which are not packages to install. Unlike pipreqs, submodules (e.g. `api/openai.py` in a package) are not counted,
+    so they don't hide packages with the same name.
+
+    Returns:
+    (
+        {
+            "path/to/subproject": {"numpy", "omegaconf", ...},
+            ...
+        },
+        {
+            "path/to/subproject": {"subproject", "reimagined", "pipeline", ...},
+            ...
+        }
+    )
+    """
+    markers = set(SUBPROJECT_MARKERS) | {requirements_name}
+    subprojects: dict[str, set[str]] = {}
+    local_modules: dict[str, set[str]] = {}
+    # Closest subproject root for each visited folder (os.walk is top-down, so parents come first)
+    owners: dict[str, str | None] = {}
+
+    # Normalize the path (e.g. trailing slash), so that os.path.dirname matches the parent folder
+    for dirpath, dirnames, filenames in os.walk(os.path.normpath(target_folder)):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in IGNORED_DIRS]
+        if markers.intersection(filenames):
+            owner = dirpath
+            subprojects[owner] = set()
+            local_modules[owner] = {os.path.basename(owner)}
+        else:
+            owner = owners.get(os.path.dirname(dirpath))
+        owners[dirpath] = owner
+
+        if owner is None:
+            continue
+        is_package = "__init__.py" in filenames
+        if not is_package:
+            local_modules[owner].update(dirnames)
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            if not is_package:
+                local_modules[owner].add(os.path.splitext(filename)[0])
+            subprojects[owner].update(get_file_imports(os.path.join(dirpath, filename)))
+    return subprojects, local_modules
+
+def get_subproject_packages(
+    subproject_imports: dict[str, set[str]], local_modules: dict[str, set[str]]
+) -> dict[str, List[str]]:
+    """
+    Convert imports of each subproject to PyPI package names using the pipreqs mapping.
+    Standard library and the subproject's own local modules are skipped (the same way pipreqs does).
+
+    Example:
+    {"path/to/subproject": {"yaml", "sklearn", "os"}} --> {"path/to/subproject": ["PyYAML", "scikit_learn"]}
+    """
+    pipreqs = import_pipreqs()
+    with open(pipreqs.join("stdlib"), "r") as f:
+        stdlib = {line.strip() for line in f}
+
+    return {
+        subproject: pipreqs.get_pkg_names(imports - local_modules.get(subproject, set()) - stdlib)
+        for subproject, imports in subproject_imports.items()
+    }
+
+def resolve_packages(packages: set[str]) -> dict[str, dict[str, str]]:
+    """
+    Find versions of the packages, like pipreqs does: locally installed packages first, then PyPI.
+    Each package is looked up only once, even if it's used by several subprojects.
+    Packages that couldn't be resolved are skipped.
+
+    Returns:
+    {
+        "scikit_learn": {"name": "scikit-learn", "constraint": "==1.5.2"},
+        ...
+    }
+    """
+    pipreqs = import_pipreqs()
+    installed = pipreqs.get_locally_installed_packages()
+    resolved = {}
+    for package in packages:
+        for installed_package in installed:
+            # Same matching as pipreqs.get_import_local
+            if package in installed_package["exports"] or package == installed_package["name"]:
+                resolved[package] = installed_package
+                break
+
+    for info in pipreqs.get_imports_info(sorted(packages - set(resolved))):
+        resolved[info["name"]] = info
+
+    return {
+        package: dict(name=info["name"], constraint=f"=={info['version']}" if info["version"] else "")
+        for package, info in resolved.items()
+    }
+
+def update_monorepo_requirements(target_folder: str, requirements_path: str = "requirements.txt"):
+    """
+    Update the requirements file of every subproject in the target folder.
+    The folder is scanned only once and each package is resolved only once for all subprojects.
+    """
+    requirements_name = os.path.basename(requirements_path)
+    subproject_imports, local_modules = scan_subprojects(target_folder, requirements_name)
+    if not subproject_imports:
+        print(f"No subprojects found in {target_folder}.")
+        return
+
+    subproject_packages = get_subproject_packages(subproject_imports, local_modules)
+    resolved = resolve_packages(set().union(*subproject_packages.values()))
+
+    for subproject, packages in subproject_packages.items():
+        requirements = [resolved[package] for package in packages if package in resolved]
+        requirements_file = os.path.join(subproject, requirements_name)
+        update_requirements_file(requirements_file, requirements)
+        print(f"Updated {requirements_file} ({len(requirements)} packages found).")
     
 
 def main():
@@ -159,7 +342,10 @@ def main():
     args = parser.parse_args()
 
     # Run the update
-    update_requirements(args.target_folder)
+    if args.monorepo:
+        update_monorepo_requirements(args.target_folder, args.requirements_path)
+    else:
+        update_requirements(args.target_folder, args.requirements_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Scripts are not a package, import them from the scripts folder
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
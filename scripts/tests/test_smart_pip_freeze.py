@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from smart_pip_freeze import get_file_imports, get_subproject_packages, scan_subprojects
+
+
+def write(path, content: str = "") -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    """
+    repo/
+        scripts/run.py                      (outside of any subproject)
+        lib_a/setup.py
+        lib_a/src/lib_a/__init__.py
+        lib_a/src/lib_a/core.py
+        lib_a/src/lib_a/api/__init__.py
+        lib_a/src/lib_a/api/yaml.py         (submodule named as a dependency)
+        lib_a/plugin/requirements.txt       (nested subproject)
+        lib_a/plugin/main.py
+        lib_b/pyproject.toml
+        lib_b/requests.py                   (local script named as a dependency)
+        lib_b/app.py
+    """
+    write(tmp_path / "scripts" / "run.py", "import pandas\n")
+    write(tmp_path / "lib_a" / "setup.py", "from setuptools import setup\n")
+    write(tmp_path / "lib_a" / "src" / "lib_a" / "__init__.py", "from .core import run\n")
+    write(tmp_path / "lib_a" / "src" / "lib_a" / "core.py", "import numpy as np\nfrom yaml import safe_load\nimport os\n")
+    write(tmp_path / "lib_a" / "src" / "lib_a" / "api" / "__init__.py")
+    write(tmp_path / "lib_a" / "src" / "lib_a" / "api" / "yaml.py", "import requests\n")
+    write(tmp_path / "lib_a" / "plugin" / "requirements.txt")
+    write(tmp_path / "lib_a" / "plugin" / "main.py", "import sklearn.metrics\n")
+    write(tmp_path / "lib_b" / "pyproject.toml")
+    write(tmp_path / "lib_b" / "requests.py", "import json\n")
+    write(tmp_path / "lib_b" / "app.py", "import requests\nimport bs4\n")
+    return tmp_path
+
+
+def test_get_file_imports(tmp_path):
+    path = tmp_path / "module.py"
+    write(path, "import a.b, c\nfrom d.e import f\nfrom . import g\nfrom .h import i\nfrom ..j import k\n")
+    assert get_file_imports(str(path)) == {"a", "c", "d"}
+
+
+def test_get_file_imports_invalid_syntax(tmp_path):
+    path = tmp_path / "broken.py"
+    write(path, "import (\n")
+    assert get_file_imports(str(path)) == set()
+
+
+def test_scan_subprojects(monorepo):
+    imports, local_modules = scan_subprojects(str(monorepo))
+
+    lib_a, plugin, lib_b = (str(monorepo / "lib_a"), str(monorepo / "lib_a" / "plugin"), str(monorepo / "lib_b"))
+    # Files outside of any subproject (scripts/run.py) are ignored, nested roots own their files
+    assert imports == {
+        lib_a: {"setuptools", "numpy", "yaml", "os", "requests"},
+        plugin: {"sklearn"},
+        lib_b: {"json", "requests", "bs4"},
+    }
+    # Submodules of packages (lib_a/api/yaml.py) are not local top-level modules
+    assert local_modules[lib_a] == {"lib_a", "setup", "src", "plugin"}
+    assert local_modules[plugin] == {"plugin", "main"}
+    assert local_modules[lib_b] == {"lib_b", "requests", "app"}
+
+
+def test_scan_subprojects_trailing_slash(monorepo):
+    assert scan_subprojects(str(monorepo) + os.sep) == scan_subprojects(str(monorepo))
+    assert scan_subprojects(str(monorepo / "lib_b") + os.sep)[0] == {str(monorepo / "lib_b"): {"json", "requests", "bs4"}}
+
+
+def test_scan_subprojects_requirements_name(monorepo):
+    imports, _ = scan_subprojects(str(monorepo), requirements_name="requirements-dev.txt")
+    assert str(monorepo / "lib_a" / "plugin") not in imports
+    assert imports[str(monorepo / "lib_a")] >= {"sklearn", "numpy"}
+
+
+def test_get_subproject_packages(monorepo):
+    pytest.importorskip("pipreqs")
+    imports, local_modules = scan_subprojects(str(monorepo))
+    packages = get_subproject_packages(imports, local_modules)
+
+    # Local modules hide packages only in their own subproject
+    assert packages == {
+        str(monorepo / "lib_a"): ["numpy", "PyYAML", "Requests", "setuptools"],
+        str(monorepo / "lib_a" / "plugin"): ["scikit_learn"],
+        str(monorepo / "lib_b"): ["beautifulsoup4"],
+    }